@@ -1,29 +1,122 @@
-import argparse
+import os
 import pandas as pd
 import re
 import numpy as np
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-import time
-from IPython.display import display
+
+# Rows per chunk when streaming the Spotify CSV exports
+_CSV_CHUNKSIZE = 200_000
+
+# pyarrow is optional: with it, text columns are Arrow-backed strings and parsed CSVs are cached as Parquet
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+_STRING_DTYPE = 'string[pyarrow]' if pa is not None else 'string'
+
+# Matches bracketed album-title suffixes such as "(Remastered 2011)" or "[Deluxe Edition]"
+_ALBUM_CLEAN_RE = re.compile(r"\s*[\(\[][^()\[\]]*(remaster|deluxe|bonus|mix|edition)[^()\[\]]*[\)\]]", re.IGNORECASE)
+
+# Header before the followed-artist list on the Seated notifications page, and the stray
+# "Following" button labels within it
+_SEATED_HEADER_RE = re.compile(r'Following \(\d+\)')
+_SEATED_LINE_RE = re.compile(r'\nFollowing')
+
+# Seconds to wait for the SMS verification to be completed, and for the followed-artist list to render
+_SEATED_LOGIN_TIMEOUT = 300
+_SEATED_PAGE_TIMEOUT = 30
+
+def _read_csv(csv_file, **kwargs):
+    """Read a whole CSV with the multithreaded pyarrow engine, falling back to the C engine."""
+    try:
+        return pd.read_csv(csv_file, engine='pyarrow', **kwargs)
+    except (ImportError, ValueError):
+        # pyarrow is not installed, or cannot handle this file/option combination
+        return pd.read_csv(csv_file, engine='c', low_memory=False, **kwargs)
+
+def _read_csv_chunks(csv_file, usecols, dtype):
+    """
+    Yield chunks of the given CSV columns. With pyarrow installed, the parsed columns are cached in a
+    '<name>.csv.cache.parquet' file next to the CSV and read from there for as long as it is newer than the CSV.
+    """
+    if pq is None:
+        yield from pd.read_csv(csv_file, usecols=usecols, dtype=dtype, chunksize=_CSV_CHUNKSIZE)
+        return
+
+    parquet_file = os.fspath(csv_file) + '.cache.parquet'
+    if os.path.exists(parquet_file) and os.path.getmtime(parquet_file) >= os.path.getmtime(csv_file):
+        # Read the first batch before yielding anything, so a corrupt or mismatched cache falls back to
+        # parsing the CSV (which rewrites the cache) instead of breaking every load
+        try:
+            cache = pq.ParquetFile(parquet_file)
+            batches = cache.iter_batches(batch_size=_CSV_CHUNKSIZE, columns=usecols)
+            first_batch = next(batches, None)
+            if first_batch is None:
+                # An empty CSV still yields one empty chunk with the expected columns
+                first_batch = cache.schema_arrow.empty_table().select(usecols)
+            first_chunk = first_batch.to_pandas().astype(dtype)
+        except (OSError, pa.ArrowException, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable cache {parquet_file}: {e}")
+        else:
+            yield first_chunk
+            for batch in batches:
+                yield batch.to_pandas().astype(dtype)
+            return
+
+    # Write the cache to a temporary file that only replaces the real one once the whole CSV is parsed.
+    # Caching is best-effort: if it cannot be written, the CSV is still loaded.
+    tmp_file = parquet_file + '.tmp'
+    writer = None
+    caching = True
+    completed = False
+    try:
+        for chunk in pd.read_csv(csv_file, usecols=usecols, dtype=dtype, chunksize=_CSV_CHUNKSIZE):
+            if caching:
+                try:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_file, table.schema)
+                    writer.write_table(table)
+                except (OSError, pa.ArrowException) as e:
+                    print(f"Not caching {csv_file} as Parquet: {e}")
+                    caching = False
+            yield chunk
+        completed = True
+    finally:
+        if writer is not None:
+            writer.close()
+            if completed and caching:
+                os.replace(tmp_file, parquet_file)
+            else:
+                os.remove(tmp_file)
+
+def display(*objs, **kwargs):
+    """Show objects with IPython's display, importing IPython only when something is displayed."""
+    from IPython.display import display as ipython_display
+    return ipython_display(*objs, **kwargs)
 
 class MusicManager:
     def __init__(self):
         # Initialize DataFrames and collections for artist and album data
         self.artist_data = pd.DataFrame()
         self.album_data = pd.DataFrame()
-        self.seated_artist_data = []
+        self.seated_artist_data = pd.Index([], dtype=object)
         self.cleanup_review = pd.DataFrame()
-        self.artist_name_mapping = {}
-        self.exclude_artists = set()  
+        self.artist_name_mapping = pd.Series(dtype=object)
+        self.exclude_artists = pd.Index([], dtype=object)
+        self._all_artists_cache = None
+        self._driver = None
 
     # ---------- File Loading Methods ----------
 
     def load_artist_mapping(self, csv_file):
         """Load artist cleanup mapping from a CSV file (colon-separated)."""
         try:
-            mapping_df = pd.read_csv(csv_file, sep=':')
-            self.artist_name_mapping = dict(zip(mapping_df['Original Name'], mapping_df['Cleaned Name']))
+            mapping_df = _read_csv(csv_file, sep=':')
+            # Keep the mapping as a Series indexed by original name for Series.map; like a dict, a repeated
+            # original name keeps its last entry
+            mapping_df = mapping_df.drop_duplicates(subset='Original Name', keep='last')
+            self.artist_name_mapping = mapping_df.set_index('Original Name')['Cleaned Name']
             print(f"Artist cleanup mapping loaded from {csv_file}")
         except Exception as e:
             print(f"Error loading artist cleanup mapping: {e}")
@@ -31,8 +124,17 @@ class MusicManager:
     def load_artists(self, csv_file):
         """Load and clean artist data from a CSV file into a DataFrame."""
         try:
-            self.artist_data = pd.read_csv(csv_file)
-            self.artist_data['name'] = self.artist_data['name'].apply(self._clean_artist_name)
+            # Stream the CSV in chunks so peak memory stays around one chunk
+            chunks = []
+            for chunk in _read_csv_chunks(csv_file, usecols=['name'], dtype={'name': _STRING_DTYPE}):
+                names = chunk['name']
+                chunk['name'] = names.map(self.artist_name_mapping).fillna(names).astype(names.dtype)
+                chunks.append(chunk)
+            artist_data = pd.concat(chunks, ignore_index=True)
+            # Store names as categorical codes, matching the album data's Artist column
+            artist_data['name'] = artist_data['name'].astype('category')
+            self.artist_data = artist_data
+            self._all_artists_cache = None
             print(f"Artist data loaded and cleaned from {csv_file}")
         except Exception as e:
             print(f"Error loading artist data: {e}")
@@ -40,27 +142,25 @@ class MusicManager:
     def load_albums(self, csv_file):
         """Load and clean album data, rename columns, apply cleanup rules, and track title changes."""
         try:
-            album_data = pd.read_csv(csv_file)
-            
-            # Standardize column names for consistency
-            album_data.rename(columns={'title': 'Album Title', 'artist': 'Artist', 'releasedDate': 'Release Date'}, inplace=True)
-            
-            # Preserve original album titles for comparison after cleaning
-            album_data['Original Album Title'] = album_data['Album Title']
-            
-            # Format release dates and extract the year
-            album_data['Release Date'] = pd.to_datetime(album_data['Release Date'], errors='coerce')
-            album_data['Release Year'] = album_data['Release Date'].dt.year
-            
-            # Clean album titles and apply artist name cleanup
-            album_data['Album Title'] = album_data['Album Title'].apply(self._clean_album_title)
-            album_data['Artist'] = album_data['Artist'].apply(self._clean_artist_name)
-            
-            # Track changes by storing rows with modified album titles
-            self.cleanup_review = album_data[album_data['Original Album Title'] != album_data['Album Title']][['Original Album Title', 'Album Title']]
-            
-            # Store final album data without the 'Original Album Title' column
-            self.album_data = album_data.drop(columns=['Original Album Title'])
+            # Only read the columns we use, as strings, and clean each chunk as it is read
+            chunks, reviews = [], []
+            for chunk in _read_csv_chunks(
+                csv_file,
+                usecols=['title', 'artist', 'releasedDate'],
+                dtype={'title': _STRING_DTYPE, 'artist': _STRING_DTYPE, 'releasedDate': _STRING_DTYPE},
+            ):
+                chunk, review = self._clean_album_chunk(chunk)
+                chunks.append(chunk)
+                reviews.append(review)
+
+            album_data = pd.concat(chunks, ignore_index=True)
+            # Store artists as categorical codes; each name repeats across many albums
+            album_data['Artist'] = album_data['Artist'].astype('category')
+            # Sort once here so the album views don't re-sort on every call
+            album_data.sort_values(by=['Artist', 'Release Date'], inplace=True, ignore_index=True)
+            self.album_data = album_data
+            self.cleanup_review = pd.concat(reviews, ignore_index=True)
+            self._all_artists_cache = None
             print(f"Album data loaded and cleaned from {csv_file}")
             
         except Exception as e:
@@ -72,12 +172,14 @@ class MusicManager:
         try:
             # Read each line, strip whitespace, and sort the artist names
             with open(exclude_file, 'r') as file:
-                self.exclude_artists = sorted({line.strip() for line in file if line.strip()})
+                lines = file.read().splitlines()
+            sorted_artists = sorted({line.strip() for line in lines if line.strip()})
+            self.exclude_artists = pd.Index(sorted_artists)
 
-            # Write the sorted data back to the original file
-            with open(exclude_file, 'w') as file:
-                for artist in self.exclude_artists:
-                    file.write(f"{artist}\n")
+            # Write the sorted data back to the original file, unless it is already sorted and clean
+            if lines != sorted_artists:
+                with open(exclude_file, 'w') as file:
+                    file.write("".join(f"{artist}\n" for artist in sorted_artists))
             
             print(f"Exclude list loaded and sorted from {exclude_file}")
         
@@ -85,73 +187,147 @@ class MusicManager:
             print(f"Error loading exclude list: {e}")
 
 
-    def load_seated_artists(self, filename, fetch=False, login_id=None):
+    def load_seated_artists(self, filename, fetch=False, login_id=None, reuse_driver=False):
         """
         Load artist data from a specified text file, or fetch from Seated if fetch=True.
-        When fetching, the login_id is required.
+        When fetching, the login_id is required. With reuse_driver=True the logged-in browser
+        is kept open for later fetches until close() is called.
         """
         if fetch and not login_id:
             raise ValueError("login_id is required when fetch=True")
 
         if fetch:
             try:
-                driver = webdriver.Chrome()
-                driver.get('https://go.seated.com/notifications/login')
-                phone_number_input = driver.find_element(By.CSS_SELECTOR, 'input[placeholder="Phone Number"]')
-                phone_number_input.send_keys(login_id)
-                verify_button = driver.find_element(By.XPATH, '//button[text()="Verify"]')
-                verify_button.click()
-                input("Press Enter to continue...")
-
-                driver.get('https://go.seated.com/notifications')
-                input("Press Enter to continue...")
-                page_text = driver.find_element(By.TAG_NAME, 'body').text
-                remaining_text = re.split(r'Following \(\d+\)', page_text, maxsplit=1)[-1]
-                remaining_text = re.sub(r'\nFollowing', '', remaining_text).strip()
+                self.seated_artist_data = pd.Index(sorted(set(self._fetch_seated(login_id))))
 
+                # Save the cleaned names, one per line, in the format the non-fetch branch reads
                 with open(filename, 'w') as file:
-                    file.write(remaining_text)
-                self.seated_artist_data = [line.strip() for line in remaining_text.splitlines() if line.strip()]
+                    file.write('\n'.join(self.seated_artist_data))
                 print(f"Data fetched and saved to {filename}")
             except Exception as e:
                 print(f"Error fetching data: {e}")
+                # Don't keep a browser in an unknown state; the next fetch logs in again
+                self.close()
             finally:
-                driver.quit()
+                if not reuse_driver:
+                    self.close()
         else:
             try:
                 with open(filename, 'r') as file:
-                    self.seated_artist_data = [line.strip() for line in file if line.strip()]
+                    # Strip each line once and keep the non-empty names
+                    seated_artists = {artist for line in file if (artist := line.strip())}
+                self.seated_artist_data = pd.Index(sorted(seated_artists))
                 print(f"Seated artist data loaded from {filename}")
             except Exception as e:
                 print(f"Error loading seated artist data: {e}")
 
-    # ---------- Data Processing and Cleanup Methods ----------
+    def _fetch_seated(self, login_id):
+        """Return the followed artist names from Seated, logging in first unless the cached browser already has."""
+        # Selenium is only needed for fetching, so don't pay for importing it otherwise
+        from selenium import webdriver
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        driver = self._driver
+        new_session = driver is None
+        if new_session:
+            # Skip image loading, GPU compositing and first-run/extension setup; the page is only
+            # scraped for text. The window stays visible (not headless) so the SMS verification
+            # code can be entered.
+            options = webdriver.ChromeOptions()
+            options.add_argument('--blink-settings=imagesEnabled=false')
+            options.add_argument('--disable-gpu')
+            options.add_argument('--disable-extensions')
+            options.add_argument('--no-first-run')
+            options.add_argument('--no-default-browser-check')
+            driver = self._driver = webdriver.Chrome(options=options)
+
+            driver.get('https://go.seated.com/notifications/login')
+            phone_number_input = driver.find_element(By.CSS_SELECTOR, 'input[placeholder="Phone Number"]')
+            phone_number_input.send_keys(login_id)
+            verify_button = driver.find_element(By.XPATH, '//button[text()="Verify"]')
+            verify_button.click()
 
-    def _clean_artist_name(self, name):
-        """Apply the artist cleanup mapping to a given name."""
-        return self.artist_name_mapping.get(name, name)
+            # Wait for the verification code to be entered and the login page to be left
+            WebDriverWait(driver, _SEATED_LOGIN_TIMEOUT).until(lambda d: '/login' not in d.current_url)
 
-    def _clean_album_title(self, title):
-        """Remove specific keywords within parentheses or brackets from album titles."""
-        keywords = ["remaster", "deluxe", "bonus", "mix", "edition"]
-        pattern = rf"\s*[\(\[][^()\[\]]*({'|'.join(keywords)})[^()\[\]]*[\)\]]"
-        return re.sub(pattern, '', title, flags=re.IGNORECASE).strip()
+        # A fresh login normally lands on the notifications page already; a reused browser
+        # reloads it to pick up changes
+        if not (new_session and driver.current_url.rstrip('/').endswith('/notifications')):
+            driver.get('https://go.seated.com/notifications')
+        # Wait until the rendered page text holds the header that the list is split on below
+        WebDriverWait(driver, _SEATED_PAGE_TIMEOUT).until(
+            EC.text_to_be_present_in_element((By.TAG_NAME, 'body'), 'Following (')
+        )
+        page_text = driver.find_element(By.TAG_NAME, 'body').text
+        remaining_text = _SEATED_HEADER_RE.split(page_text, maxsplit=1)[-1]
+        remaining_text = _SEATED_LINE_RE.sub('', remaining_text).strip()
+        return [artist for line in remaining_text.splitlines() if (artist := line.strip())]
+
+    def close(self):
+        """Quit the browser kept open by load_seated_artists(reuse_driver=True), if any."""
+        # Forget the driver first so a failed quit (e.g. the window was closed) never leaves a dead one cached
+        driver, self._driver = self._driver, None
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error closing browser: {e}")
+
+    # ---------- Data Processing and Cleanup Methods ----------
+
+    def _clean_album_chunk(self, album_data):
+        """Clean a chunk of raw album rows and return it with the rows whose titles were changed."""
+        # Standardize column names for consistency
+        album_data.rename(columns={'title': 'Album Title', 'artist': 'Artist', 'releasedDate': 'Release Date'}, inplace=True)
+        
+        # Extract the year straight from the ISO date strings (YYYY, YYYY-MM or YYYY-MM-DD); the
+        # strings are kept as-is since they already sort chronologically
+        album_data['Release Year'] = pd.to_numeric(album_data['Release Date'].str.slice(0, 4), errors='coerce').astype('Int16')
+        
+        # Clean album titles, running the regex only on titles that contain a bracket, and apply artist name cleanup.
+        # 'titles' keeps the original titles for the review below.
+        titles = album_data['Album Title']
+        has_brackets = titles.str.contains('(', regex=False, na=False) | titles.str.contains('[', regex=False, na=False)
+        cleaned_titles = titles.where(~has_brackets, titles[has_brackets].str.replace(_ALBUM_CLEAN_RE, '', regex=True)).str.strip()
+        album_data['Album Title'] = cleaned_titles
+        artists = album_data['Artist']
+        album_data['Artist'] = artists.map(self.artist_name_mapping).fillna(artists).astype(artists.dtype)
+        
+        # Track changes by keeping the original and cleaned titles of modified rows
+        changed = cleaned_titles.ne(titles).to_numpy(dtype=bool, na_value=False)
+        review = pd.DataFrame({'Original Album Title': titles[changed], 'Album Title': cleaned_titles[changed]})
+        
+        return album_data, review
 
     def get_all_artists(self):
         """Return a DataFrame of unique cleaned artists with album counts, sorted alphabetically."""
+        # Reuse the result until new artist or album data is loaded; hand out copies so callers can't
+        # change the cached frame
+        if self._all_artists_cache is not None:
+            return self._all_artists_cache.copy()
+
         if self.artist_data.empty and self.album_data.empty:
             print("No artist or album data loaded.")
             return pd.DataFrame(columns=['Artist', 'Album Count'])
 
         try:
-            artist_names = self.artist_data['name'].unique() if not self.artist_data.empty else np.array([])
-            album_counts = self.album_data['Artist'].value_counts().to_frame('Album Count')
-            album_counts.index.name = 'Artist'
-            album_counts.reset_index(inplace=True)
-            all_artists = pd.DataFrame(pd.unique(np.concatenate([artist_names, album_counts['Artist'].values])), columns=['Artist'])
-            all_artists = all_artists.merge(album_counts, on='Artist', how='left').fillna(0).sort_values(by='Artist').reset_index(drop=True)
-            all_artists['Album Count'] = all_artists['Album Count'].astype(int)
-            return all_artists
+            # The categories are already the unique artist names; use empty (object) categories for
+            # whichever table isn't loaded so the union below keeps a string dtype
+            no_artists = pd.Series(pd.Categorical([]))
+            artist_names = self.artist_data['name'].cat.categories if not self.artist_data.empty else no_artists.cat.categories
+            album_artists = self.album_data['Artist'] if not self.album_data.empty else no_artists
+            # Count albums per artist straight from the categorical codes (-1 marks a missing artist)
+            artist_codes = album_artists.cat.codes.to_numpy()
+            artist_categories = album_artists.cat.categories
+            album_counts = pd.Series(np.bincount(artist_codes[artist_codes >= 0], minlength=len(artist_categories)), index=artist_categories.rename('Artist'), name='Album Count')
+            # The union dedupes and sorts the names in one hashed pass, with no concatenated intermediate
+            # array; artists without albums get a count of 0
+            all_artist_index = pd.Index(artist_names, name='Artist').union(album_counts.index, sort=True)
+            album_counts = album_counts.reindex(all_artist_index, fill_value=0).astype('int32')
+            self._all_artists_cache = album_counts.reset_index()
+            return self._all_artists_cache.copy()
         except KeyError as e:
             print(f"Error: Missing expected column(s) - {e}")
             return pd.DataFrame(columns=['Artist', 'Album Count'])
@@ -167,11 +343,8 @@ class MusicManager:
     
     def formatted_album_info(self):
         """Return a DataFrame of cleaned album information, sorted by Artist and Release Date."""
-        # Sort by Artist and Release Date before selecting columns
-        sorted_album_data = self.album_data.sort_values(by=['Artist', 'Release Date'])
-        
-        # Select only the relevant columns after sorting
-        return sorted_album_data[['Album Title', 'Artist', 'Release Year']].reset_index(drop=True)
+        # Album data is sorted by Artist and Release Date when loaded, so only select the relevant columns
+        return self.album_data[['Album Title', 'Artist', 'Release Year']]
 
     # def formatted_missing_seated_artists(self):
     #     """Return a DataFrame of artists missing from the seated list and not in the exclude list."""
@@ -189,10 +362,10 @@ class MusicManager:
             print("No artist data available for comparison.")
             return pd.DataFrame(columns=['Missing Artist'])
         
-        # Ensure all components are sets
-        missing_artists = set(all_artists_df['Artist']) - set(self.seated_artist_data) - set(self.exclude_artists)
+        # Take hashed Index differences against the seated and exclude indexes built at load time
+        missing_artists = pd.Index(all_artists_df['Artist']).difference(self.seated_artist_data).difference(self.exclude_artists)
         
-        return pd.DataFrame(sorted(missing_artists), columns=['Missing Artist']).reset_index(drop=True)
+        return pd.DataFrame({'Missing Artist': missing_artists})
 
     
     def formatted_missing_library_artists(self):
@@ -205,15 +378,10 @@ class MusicManager:
             print("No artist data available in the library for comparison.")
             return pd.DataFrame(columns=['Missing Library Artist'])
 
-        # Convert the seated artists and library artists to sets for easy comparison
-        seated_artist_set = set(self.seated_artist_data)
-        library_artist_set = set(all_artists_df['Artist'])
-        
         # Find artists in seated but not in the library
-        missing_library_artists = seated_artist_set - library_artist_set
+        missing_library_artists = self.seated_artist_data.difference(pd.Index(all_artists_df['Artist']))
 
-        # Convert the result to a sorted DataFrame
-        return pd.DataFrame(sorted(missing_library_artists), columns=['Missing Library Artist']).reset_index(drop=True)
+        return pd.DataFrame({'Missing Library Artist': missing_library_artists})
 
     
     def formatted_cleanup_review(self):
@@ -235,21 +403,19 @@ class MusicManager:
     
     def formatted_exclude_artists(self):
         """Return the exclude artist list as a formatted DataFrame."""
-        if not self.exclude_artists:
+        if self.exclude_artists.empty:
             return pd.DataFrame(columns=['Excluded Artist'])
         
-        # Convert the exclude_artists set to a DataFrame
-        exclude_artists_df = pd.DataFrame(sorted(self.exclude_artists), columns=['Excluded Artist'])
-        return exclude_artists_df.reset_index(drop=True)
+        # The exclude list is stored sorted, so wrap it directly
+        return pd.DataFrame({'Excluded Artist': self.exclude_artists})
     
     def formatted_seated_artists(self):
         """Return a sorted DataFrame of seated artist data with a numeric index."""
-        if not self.seated_artist_data:
+        if self.seated_artist_data.empty:
             return pd.DataFrame(columns=['Seated Artist'])
         
-        # Convert the seated_artist_data list to a sorted DataFrame
-        sorted_seated_artists = sorted(self.seated_artist_data)
-        return pd.DataFrame(sorted_seated_artists, columns=['Seated Artist']).reset_index(drop=True)
+        # The seated artists are stored sorted, so wrap them directly
+        return pd.DataFrame({'Seated Artist': self.seated_artist_data})
 
 
 
@@ -263,8 +429,7 @@ class MusicManager:
             return
         try:
             with open(filename, 'w') as file:
-                for artist in missing_artists_df['Missing Artist']:
-                    file.write(f"{artist}\n")
+                file.write("".join(f"{artist}\n" for artist in missing_artists_df['Missing Artist']))
             print(f"Missing artists exported to {filename}")
         except Exception as e:
             print(f"Error exporting missing artists: {e}")